@@ -1,282 +1,502 @@
-from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, Form, BackgroundTasks
-from fastapi.responses import HTMLResponse, FileResponse
-import json
+from fastapi import FastAPI, Request, WebSocket, Form, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import HTMLResponse, Response, ORJSONResponse, StreamingResponse, FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.staticfiles import StaticFiles
+import orjson
 import uuid
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import aiohttp
+from selectolax.lexbor import LexborHTMLParser
 import csv
+import io
+import gzip
+import hashlib
+import html
 import time
-import random
 import re
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import quote
-from typing import List
+from typing import Set
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from operator import attrgetter
+from collections import OrderedDict
+from cachetools import TTLCache
+from aiolimiter import AsyncLimiter
+
+# 로깅 설정 (기본 INFO - 디버그 메시지는 포맷팅 자체를 생략)
+logging.basicConfig(level=logging.INFO)
+log = logging.getLogger(__name__)
+
+# 정규식 미리 컴파일
+_RE_WON = re.compile(r'([\d,]+)\s*원')
+_RE_WS = re.compile(r'\s+')
+# 대괄호 밖으로 넘어가지 않도록 [^\]] 로 제한 (불필요한 백트래킹 방지)
+_RE_CLEAN = re.compile(r'\[[^\]]*?(?:무료배송|특가|이벤트)[^\]]*?\]|★+|☆+', re.IGNORECASE)
+
+# 더 정교한 브라우저 헤더로 봇 차단 우회
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+    'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
+    # br 응답은 Brotli 패키지가 있어야 aiohttp가 자동 해제함 (requirements.txt)
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1'
+}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 수명주기 - 모든 작업이 공유하는 HTTP 연결 풀과 파싱 프로세스 풀 생성/정리"""
+    app.state.http = aiohttp.ClientSession(
+        headers=DEFAULT_HEADERS,
+        timeout=aiohttp.ClientTimeout(total=20),
+        # 호스트별 연결 수를 묶어 동시 요청이 유지 중인 연결을 재사용하도록 함 (DNS 결과는 5분 캐시)
+        connector=aiohttp.TCPConnector(limit=20, limit_per_host=6, keepalive_timeout=30, ttl_dns_cache=300)
+    )
+    # HTML 파싱은 CPU 작업이므로 이벤트 루프 밖 프로세스에서 처리
+    app.state.parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    yield
+    await app.state.http.close()
+    app.state.parse_pool.shutdown()
 
 # FastAPI 앱 생성
-app = FastAPI(title="다나와 프로 크롤러")
+app = FastAPI(title="다나와 프로 크롤러", lifespan=lifespan, default_response_class=ORJSONResponse)
+# 1KB 이상 응답(결과 JSON, 다운로드)은 gzip 압축 - 메인 페이지는 시작 시 미리 압축한 바이트(Content-Encoding 지정)라 그대로 통과
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+class JobStore(OrderedDict):
+    """등록 순서(FIFO) 작업 저장소 - 조회해도 순서는 그대로, 한도를 넘거나 만료되면 먼저 등록된 작업부터 제거"""
+    def __init__(self, max_jobs: int, ttl: float):
+        super().__init__()
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._stamps = {}
+    
+    def _purge(self, now: float):
+        """한도를 넘거나 만료된 작업 제거 - 등록 순서대로 앞에 있는 작업이 가장 오래됨, 앞에서부터만 검사"""
+        while self and (len(self) > self.max_jobs or now - self._stamps[next(iter(self))] > self.ttl):
+            old_key = next(iter(self))
+            del self[old_key]
+            del self._stamps[old_key]
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        now = time.monotonic()
+        self._stamps[key] = now
+        self._purge(now)
+    
+    # 조회할 때도 만료 작업을 정리 - 새 작업이 없는 조용한 서버에서도 오래된 결과가 남지 않고 404로 응답
+    def __getitem__(self, key):
+        self._purge(time.monotonic())
+        return super().__getitem__(key)
+    
+    def get(self, key, default=None):
+        self._purge(time.monotonic())
+        return super().get(key, default)
+
+# 크롤링 작업 상태 저장 (무한히 쌓이지 않도록 최대 256개, 1시간 보관)
+crawling_jobs = JobStore(max_jobs=256, ttl=3600)
+active_connections: Set[WebSocket] = set()
+
+# 동일 검색 결과 캐시 (10분) 및 진행 중인 동일 검색 공유
+_SEARCH_CACHE = TTLCache(maxsize=256, ttl=600)
+_IN_FLIGHT = {}
+
+# 다나와 요청 속도 제한 - 모든 작업이 하나의 토큰 버킷을 공유 (1.5초에 1회, 몰아서 보내지 않음)
+_DANAWA_LIMITER = AsyncLimiter(max_rate=1, time_period=1.5)
+
+async def broadcast(payload: bytes):
+    """직렬화된 메시지 하나를 모든 WebSocket에 동시 전송"""
+    connections = list(active_connections)
+    
+    # 50개 단위로 나눠 동시 전송 후 이벤트 루프에 양보
+    for i in range(0, len(connections), 50):
+        batch = connections[i:i + 50]
+        results = await asyncio.gather(
+            *(connection.send_bytes(payload) for connection in batch),
+            return_exceptions=True
+        )
+        
+        # 전송 실패한 연결 정리
+        for connection, result in zip(batch, results):
+            if isinstance(result, Exception):
+                active_connections.discard(connection)
+        
+        await asyncio.sleep(0)
 
-# 크롤링 작업 상태 저장
-crawling_jobs = {}
-active_connections: List[WebSocket] = []
+# 쿠팡 검색 URL 고정 접두사 (상품마다 f-string을 다시 만들지 않음)
+_COUPANG_SEARCH_PREFIX = "https://www.coupang.com/np/search?q="
+
+@dataclass(slots=True)
+class Product:
+    """상품 정보 - 상품마다 dict를 만드는 대신 슬롯 객체로 저장"""
+    name: str
+    price: int
+    product_url: str
+    
+    @property
+    def coupang_search_url(self):
+        """쿠팡 검색 URL - 저장하지 않고 내보낼 때만 생성"""
+        return _COUPANG_SEARCH_PREFIX + quote(self.name)
 
 class DanawaWebCrawler:
-    def __init__(self, job_id: str):
+    # 필드별 선택자 후보 (우선순위 순 - 선택자마다 css_first로 확인)
+    # 복합 선택자로 합치면 문서 순서대로 매칭되어 a[title] 같은 최후 후보가 앞설 수 있으므로 합치지 않음
+    # 현재 다나와 레이아웃(p.prod_name a, strong.num)을 맨 앞에 두어 보통 첫 후보에서 끝남
+    _NAME_SELECTORS = (
+        'p.prod_name a',
+        'dt.prod_name a',
+        'div.prod_name a',
+        'a.prod_name',
+        '.prod_name a',
+        'a[title]',
+        '.item_name a',
+        '.product_name a',
+        'h3 a',
+        'h4 a'
+    )
+    _PRICE_SELECTORS = (
+        'strong.num',
+        'em.num_c',
+        '.price strong',
+        'span.price',
+        '.price_sect strong',
+        '.item_price strong',
+        '.product_price strong',
+        '.price .num',
+        'em[class*="price"]',
+        'span[class*="price"]'
+    )
+    _URL_SELECTORS = (
+        'p.prod_name a',
+        'dt.prod_name a',
+        'a.prod_name'
+    )
+    # 상품 목록 시작 태그 - 이 앞(헤더, 광고, 스크립트)은 파싱하지 않음
+    _LIST_MARKER = b'<ul class="product_list'
+    # 상품 리스트 선택자 후보 (우선순위 순 - 처음 매칭되는 것만 사용)
+    _ITEM_SELECTORS = (
+        'ul.product_list li',
+        '.main_prodlist li',
+        '.prod_list li',
+        'li.prod_item',
+        '.item_wrap',
+        '.product_item'
+    )
+    # 위 선택자들의 클래스명 - 하나도 없으면 상품이 없는 페이지이므로 파싱 생략 (선택자에서 뽑아 목록이 어긋나지 않게 함)
+    _ITEM_MARKERS = tuple(re.search(r'\.([\w-]+)', sel).group(1).encode() for sel in _ITEM_SELECTORS)
+    # 고정 쿼리 파라미터를 미리 붙여둔 검색 URL 템플릿
+    _SEARCH_URL_TMPL = "https://search.danawa.com/dsearch.php?query={q}&sort=opinionDESC&list=list&boost=true&limit=40&mode=simple&page={p}"
+
+    def __init__(self, job_id: str, session: aiohttp.ClientSession, parse_pool: ProcessPoolExecutor):
         self.job_id = job_id
-        self.session = requests.Session()
-        # 더 정교한 브라우저 헤더로 봇 차단 우회
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-            'Accept-Language': 'ko-KR,ko;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1'
-        })
+        # 앱 전역 연결 풀 공유 (작업마다 TLS 핸드셰이크 반복 방지)
+        self.session = session
+        self.parse_pool = parse_pool
         self.status = "준비중"
         self.progress = 0
         self.total_items = 0
         self.current_item = 0
         self.results = []
+        # 상태 조회마다 len()을 다시 계산하지 않도록 결과 수를 따로 보관
+        self.result_count = 0
+        # 진행상황 이벤트 큐 (_flush_loop에서 묶어서 전송)
+        self._progress_queue = asyncio.Queue()
+        self._flushing = False
         
-    async def notify_progress(self, message: str):
-        """WebSocket으로 진행상황 전송"""
-        for connection in active_connections:
-            try:
-                await connection.send_text(json.dumps({
-                    "job_id": self.job_id,
-                    "status": self.status,
-                    "progress": self.progress,
-                    "current_item": self.current_item,
-                    "total_items": self.total_items,
-                    "message": message
-                }))
-            except:
-                pass
+    def notify_progress(self, message: str):
+        """진행상황 이벤트를 큐에 적재 - 전송은 _flush_loop에서 처리"""
+        self._progress_queue.put_nowait({
+            "job_id": self.job_id,
+            "status": self.status,
+            "progress": self.progress,
+            "current_item": self.current_item,
+            "total_items": self.total_items,
+            "result_count": self.result_count,
+            "message": message
+        })
+    
+    async def _flush_progress(self):
+        """쌓인 진행상황을 하나의 메시지로 묶어 WebSocket으로 전송"""
+        events = []
+        while not self._progress_queue.empty():
+            events.append(self._progress_queue.get_nowait())
+        
+        if not events or not active_connections:
+            return
+        
+        await broadcast(orjson.dumps({"events": events}))
+    
+    async def _flush_loop(self):
+        """크롤링 중 250ms마다 진행상황 전송 (상태 조회 폴링 대신 푸시)"""
+        while self._flushing:
+            await asyncio.sleep(0.25)
+            await self._flush_progress()
+        
+        # 종료 직전 남은 이벤트 전송
+        await self._flush_progress()
     
     async def crawl_danawa(self, keyword: str, max_pages: int = 3):
         """다나와 크롤링 메인 함수"""
+        self._flushing = True
+        flush_task = asyncio.create_task(self._flush_loop())
+        
         try:
             self.status = "시작"
-            await self.notify_progress(f"'{keyword}' 검색을 시작합니다...")
-            
-            # 기본 정보 수집
-            basic_products = await self.collect_basic_info(keyword, max_pages)
+            self.notify_progress(f"'{keyword}' 검색을 시작합니다...")
+            
+            # 기본 정보 수집 (캐시 → 진행 중인 동일 검색 → 새 크롤링 순)
+            key = (keyword, max_pages)
+            basic_products = _SEARCH_CACHE.get(key)
+            
+            if basic_products is not None:
+                self.notify_progress("⚡ 최근 검색 결과를 재사용합니다.")
+            else:
+                task = _IN_FLIGHT.get(key)
+                if task is None:
+                    task = asyncio.create_task(self.collect_basic_info(keyword, max_pages))
+                    _IN_FLIGHT[key] = task
+                    task.add_done_callback(lambda _: _IN_FLIGHT.pop(key, None))
+                else:
+                    self.notify_progress("🔁 동일한 검색이 진행 중이라 결과를 함께 기다립니다...")
+                
+                basic_products, complete = await asyncio.shield(task)
+                # 중간에 오류로 끊긴 부분 결과는 캐시하지 않음 (같은 검색이 10분간 잘린 결과를 받지 않도록)
+                if basic_products and complete:
+                    _SEARCH_CACHE[key] = basic_products
             
             if not basic_products:
                 self.status = "실패"
-                await self.notify_progress("상품을 찾을 수 없습니다.")
+                self.notify_progress("상품을 찾을 수 없습니다.")
                 return []
             
-            self.total_items = len(basic_products)
             self.status = "완료"
-            self.results = basic_products
-            await self.notify_progress(f"총 {len(basic_products)}개 상품 수집 완료!")
+            self._set_results(basic_products)
+            self.notify_progress(f"총 {self.result_count}개 상품 수집 완료!")
             
             return basic_products
             
         except Exception as e:
             self.status = "오류"
-            await self.notify_progress(f"오류 발생: {str(e)}")
+            self.notify_progress(f"오류 발생: {str(e)}")
             return []
+        
+        finally:
+            self._flushing = False
+            await flush_task
+    
+    def _set_results(self, products):
+        """결과 저장 - 결과 수도 함께 갱신"""
+        self.results = products
+        self.result_count = len(products)
+        self.total_items = self.result_count
     
     async def collect_basic_info(self, keyword: str, max_pages: int):
-        """기본 상품 정보 수집 - 개선된 버전"""
+        """기본 상품 정보 수집 - 공유 속도 제한에 맞춰 페이지를 순서대로 요청하고 빈 페이지에서 중단 (상품, 완료 여부) 반환"""
         products = []
+        # 건너뛰거나 오류로 멈춘 페이지가 있으면 False
+        complete = True
+        
+        # 키워드 인코딩은 페이지 루프 밖에서 한 번만
+        encoded_keyword = quote(keyword, safe='')
+        loop = asyncio.get_running_loop()
         
         for page in range(1, max_pages + 1):
-            await self.notify_progress(f"🌐 {page}페이지 접속 준비 중...")
-            
-            # URL 인코딩 개선
-            encoded_keyword = quote(keyword.encode('utf-8'))
-            url = f"https://search.danawa.com/dsearch.php?query={encoded_keyword}&sort=opinionDESC&list=list&boost=true&limit=40&mode=simple&page={page}"
+            self.notify_progress(f"🌐 {page}페이지 접속 준비 중...")
             
             try:
-                await self.notify_progress(f"📡 {page}페이지 요청 중...")
-                
-                # 더 긴 타임아웃과 재시도
-                response = self.session.get(url, timeout=20)
+                # 모든 작업이 하나의 토큰 버킷을 공유 - 작업마다 한 번에 한 요청만 대기열에 올려 다른 검색이 밀리지 않음
+                await _DANAWA_LIMITER.acquire()
                 
-                await self.notify_progress(f"📨 응답 수신: {response.status_code}")
-                
-                if response.status_code != 200:
-                    await self.notify_progress(f"❌ HTTP 오류: {response.status_code}")
-                    continue
+                url = self._SEARCH_URL_TMPL.format(q=encoded_keyword, p=page)
+                self.notify_progress(f"📡 {page}페이지 요청 중...")
                 
-                response.raise_for_status()
+                # 이벤트 루프를 막지 않는 비동기 요청
+                async with self.session.get(url) as response:
+                    self.notify_progress(f"📨 {page}페이지 응답 수신: {response.status}")
+                    
+                    if response.status != 200:
+                        self.notify_progress(f"❌ HTTP 오류: {response.status}")
+                        complete = False
+                        continue
+                    
+                    # 디코딩 없이 바이트 그대로 파서에 전달
+                    body = await response.read()
                 
-                await self.notify_progress(f"🔍 HTML 내용 분석 중...")
+                self.notify_progress(f"🔍 {page}페이지 HTML 내용 분석 중...")
                 
                 # HTML 내용 길이 확인
-                html_length = len(response.text)
-                await self.notify_progress(f"📄 HTML 크기: {html_length:,} 바이트")
+                html_length = len(body)
+                self.notify_progress(f"📄 HTML 크기: {html_length:,} 바이트")
                 
                 if html_length < 1000:
-                    await self.notify_progress(f"⚠️ HTML이 너무 작음 - 차단되었을 가능성")
+                    self.notify_progress(f"⚠️ HTML이 너무 작음 - 차단되었을 가능성")
+                    complete = False
                     continue
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                await self.notify_progress(f"🎯 상품 정보 추출 중...")
-                page_products = self.extract_products_from_page(soup)
+                self.notify_progress(f"🎯 상품 정보 추출 중...")
+                # 상품 목록 흔적이 없는 페이지(검색 결과 없음)는 파싱 없이 빈 페이지로 처리
+                if any(marker in body for marker in self._ITEM_MARKERS):
+                    # 파싱은 CPU 작업이므로 프로세스 풀에서 처리
+                    page_products = await loop.run_in_executor(
+                        self.parse_pool, self.extract_products_from_page, body
+                    )
+                else:
+                    page_products = []
                 
                 if not page_products:
-                    await self.notify_progress(f"❌ {page}페이지에서 상품을 찾을 수 없습니다.")
-                    # HTML 구조 확인을 위한 디버깅
-                    title = soup.find('title')
+                    self.notify_progress(f"❌ {page}페이지에서 상품을 찾을 수 없습니다.")
+                    # HTML 구조 확인을 위한 디버깅 (바이트 탐색이라 파싱 없이 바로 처리)
+                    title = self.get_page_title(body)
                     if title:
-                        await self.notify_progress(f"📰 페이지 제목: {title.get_text()[:50]}")
+                        self.notify_progress(f"📰 페이지 제목: {title[:50]}")
                     break
                 
                 products.extend(page_products)
-                await self.notify_progress(f"✅ {page}페이지: {len(page_products)}개 상품 발견")
-                
-                # 페이지 간 더 긴 대기 (봇 차단 방지)
-                if page < max_pages:
-                    await self.notify_progress(f"⏱️ 다음 페이지 대기 중...")
-                    time.sleep(random.uniform(3, 6))
+                self.notify_progress(f"✅ {page}페이지: {len(page_products)}개 상품 발견")
                 
             except Exception as e:
-                await self.notify_progress(f"💥 {page}페이지 오류: {str(e)}")
+                self.notify_progress(f"💥 {page}페이지 오류: {str(e)}")
+                complete = False
                 break
         
-        return products
+        return products, complete
+    
+    @classmethod
+    def get_page_title(cls, body):
+        """페이지 제목 추출 (디버깅용) - 트리를 만들지 않고 <title> 태그를 바이트에서 바로 찾음"""
+        start = body.find(b'<title')
+        if start < 0:
+            return ''
+        start = body.find(b'>', start) + 1
+        end = body.find(b'</title>', start)
+        if start <= 0 or end < 0:
+            return ''
+        return html.unescape(body[start:end].decode('utf-8', 'replace')).strip()
     
-    def extract_products_from_page(self, soup):
-        """페이지에서 상품 정보 추출 - 디버깅 강화"""
+    @classmethod
+    def extract_products_from_page(cls, body):
+        """페이지에서 상품 정보 추출 - 프로세스 풀에서 실행되므로 HTML 원문 바이트를 받음"""
+        # 목록을 찾으면 그 지점부터만 트리를 만들고, 못 찾으면 전체 문서로 대체 선택자 탐색
+        start = body.find(cls._LIST_MARKER)
+        tree = LexborHTMLParser(body[start:] if start > 0 else body)
         products = []
         
         # 다양한 선택자로 상품 리스트 찾기
-        selectors = [
-            'ul.product_list li',
-            '.main_prodlist li', 
-            '.prod_list li',
-            'li.prod_item',
-            '.item_wrap',
-            '.product_item'
-        ]
-        
         items = []
         used_selector = ""
         
-        for selector in selectors:
-            items = soup.select(selector)
+        for selector in cls._ITEM_SELECTORS:
+            items = tree.css(selector)
             if items:
                 used_selector = selector
                 break
         
-        print(f"디버깅: 사용된 선택자 '{used_selector}', 찾은 항목 수: {len(items)}")
+        log.debug("사용된 선택자 '%s', 찾은 항목 수: %d", used_selector, len(items))
         
         if not items:
-            # 페이지 구조 분석
-            all_li = soup.select('li')
-            all_div = soup.select('div')
-            print(f"디버깅: 전체 li 태그 수: {len(all_li)}, div 태그 수: {len(all_div)}")
+            # 페이지 구조 분석 (전체 트리 탐색이므로 디버그 모드에서만)
+            if log.isEnabledFor(logging.DEBUG):
+                all_li = tree.css('li')
+                all_div = tree.css('div')
+                log.debug("전체 li 태그 수: %d, div 태그 수: %d", len(all_li), len(all_div))
             return products
         
-        for i, item in enumerate(items[:50]):  # 최대 50개만 처리
+        # 슬라이스 복사 없이 순회하다 조기 종료
+        for i, item in enumerate(items):
+            if i >= 50:  # 최대 50개만 처리
+                break
             try:
-                product = self.extract_single_product(item)
+                product = cls.extract_single_product(item)
                 if product:
                     products.append(product)
                     if len(products) >= 40:  # 페이지당 40개 제한
                         break
             except Exception as e:
-                print(f"디버깅: {i}번째 아이템 처리 오류: {e}")
+                log.debug("%d번째 아이템 처리 오류: %s", i, e)
                 continue
                 
         return products
     
-    def extract_single_product(self, item):
+    @classmethod
+    def extract_single_product(cls, item):
         """개별 상품 정보 추출"""
-        name = self.get_product_name(item)
-        if not name or len(name.strip()) < 3:
+        # 상품명 링크는 한 번만 찾아 이름과 URL에 함께 사용
+        name, name_elem = cls.get_product_name(item)
+        if not name:
             return None
         
-        price = self.get_price(item)
-        product_url = self.get_product_url(item)
+        name = name.strip()
+        if len(name) < 3:
+            return None
         
-        if name and price > 0:
-            return {
-                'name': name.strip(),
-                'price': price,
-                'product_url': product_url,
-                'coupang_search_url': f"https://www.coupang.com/np/search?q={quote(name.strip())}"
-            }
+        price = cls.get_price(item)
+        if price <= 0:
+            return None
         
-        return None
+        return Product(name=name, price=price, product_url=cls.get_product_url(item, name_elem))
     
-    def get_product_name(self, item):
-        """상품명 추출 - 강화된 버전"""
-        selectors = [
-            'p.prod_name a',
-            'dt.prod_name a', 
-            'div.prod_name a',
-            'a.prod_name',
-            '.prod_name a',
-            'a[title]',
-            '.item_name a',
-            '.product_name a',
-            'h3 a',
-            'h4 a'
-        ]
-        
-        for selector in selectors:
-            elem = item.select_one(selector)
+    @classmethod
+    def get_product_name(cls, item):
+        """상품명 추출 - 강화된 버전 (URL에 재사용할 수 있는 상품명 링크도 함께 반환)"""
+        for selector in cls._NAME_SELECTORS:
+            elem = item.css_first(selector)
             if elem:
+                # 최우선 URL 선택자로 찾은 링크일 때만 URL 추출에 재사용 (그 외에는 URL 선택자로 따로 탐색)
+                link = elem if selector == cls._URL_SELECTORS[0] else None
+                
                 # 텍스트 우선
-                text = elem.get_text(strip=True)
+                text = elem.text(strip=True)
                 if text and len(text) > 3:
-                    return self.clean_name(text)
+                    return cls.clean_name(text), link
                 
                 # title 속성 확인
-                title = elem.get('title', '').strip()
+                title = (elem.attributes.get('title') or '').strip()
                 if title and len(title) > 3:
-                    return self.clean_name(title)
+                    return cls.clean_name(title), link
         
         # 추가 시도: 모든 a 태그 확인
-        all_links = item.select('a')
+        all_links = item.css('a')
         for link in all_links:
-            text = link.get_text(strip=True)
+            text = link.text(strip=True)
             if text and len(text) > 10 and '원' not in text:  # 가격이 아닌 것들만
-                return self.clean_name(text)
+                return cls.clean_name(text), None
         
-        return None
+        return None, None
     
-    def get_price(self, item):
+    @classmethod
+    def get_price(cls, item):
         """가격 추출 - 강화된 버전"""
-        selectors = [
-            'strong.num',
-            'em.num_c', 
-            '.price strong',
-            'span.price',
-            '.price_sect strong',
-            '.item_price strong',
-            '.product_price strong',
-            '.price .num',
-            'em[class*="price"]',
-            'span[class*="price"]'
-        ]
-        
-        for selector in selectors:
-            elem = item.select_one(selector)
-            if elem:
-                price_text = re.sub(r'[^\d]', '', elem.get_text())
-                if price_text and len(price_text) >= 3:  # 최소 3자리 이상
-                    try:
-                        price = int(price_text)
-                        if 1000 <= price <= 10000000:  # 1천원~1천만원 범위
-                            return price
-                    except:
-                        continue
+        for selector in cls._PRICE_SELECTORS:
+            elem = item.css_first(selector)
+            if not elem:
+                continue
+            
+            # 정규식 없이 한 번의 순회로 숫자만 누적
+            price = 0
+            for c in elem.text():
+                v = ord(c) - 48
+                if 0 <= v <= 9:
+                    price = price * 10 + v
+                    if price > 10000000:  # 범위 초과 시 즉시 중단
+                        break
+            
+            if 1000 <= price <= 10000000:  # 1천원~1천만원 범위
+                return price
         
         # 추가 시도: 원이 포함된 텍스트 찾기
-        text_content = item.get_text()
-        price_matches = re.findall(r'([\d,]+)\s*원', text_content)
+        text_content = item.text()
+        price_matches = _RE_WON.findall(text_content)
         for match in price_matches:
             try:
                 price = int(match.replace(',', ''))
@@ -287,727 +507,92 @@ class DanawaWebCrawler:
         
         return 0
     
-    def get_product_url(self, item):
-        """상품 URL 추출"""
-        selectors = [
-            'p.prod_name a',
-            'dt.prod_name a',
-            'a.prod_name'
-        ]
-        
-        for selector in selectors:
-            elem = item.select_one(selector)
-            if elem:
-                href = elem.get('href', '')
-                if href:
-                    if href.startswith('//'):
-                        return 'https:' + href
-                    elif href.startswith('/'):
-                        return 'https://www.danawa.com' + href
-                    return href
+    @classmethod
+    def get_product_url(cls, item, name_elem=None):
+        """상품 URL 추출 - 상품명 링크(p.prod_name a)에 href가 있으면 다시 탐색하지 않음"""
+        href = ''
+        if name_elem is not None:
+            href = name_elem.attributes.get('href') or ''
+        if not href:
+            for selector in cls._URL_SELECTORS:
+                elem = item.css_first(selector)
+                if elem:
+                    href = elem.attributes.get('href') or ''
+                    if href:
+                        break
         
-        return ''
+        if href.startswith('//'):
+            return 'https:' + href
+        elif href.startswith('/'):
+            return 'https://www.danawa.com' + href
+        return href
     
-    def clean_name(self, name):
+    @classmethod
+    def clean_name(cls, name):
         """상품명 정리"""
-        import html
         name = html.unescape(name)
+        name = _RE_CLEAN.sub('', name)
         
-        patterns = [r'\[.*?무료배송.*?\]', r'\[.*?특가.*?\]', r'\[.*?이벤트.*?\]', r'★+', r'☆+']
-        
-        for pattern in patterns:
-            name = re.sub(pattern, '', name, flags=re.IGNORECASE)
-        
-        return re.sub(r'\s+', ' ', name).strip()
-
-# HTML 웹 인터페이스 (모바일 최적화)
-HTML_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="ko">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>🛒 다나와 프로 크롤러</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 10px;
-        }
-
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 20px;
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }
-
-        .header {
-            background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-            padding: 20px;
-            text-align: center;
-            color: white;
-        }
-
-        .header h1 {
-            font-size: 2em;
-            margin-bottom: 10px;
-            font-weight: 700;
-        }
-
-        .header p {
-            font-size: 1em;
-            opacity: 0.9;
-        }
-
-        .main-content {
-            padding: 20px;
-        }
-
-        .search-form {
-            background: #f8f9ff;
-            padding: 20px;
-            border-radius: 15px;
-            margin-bottom: 20px;
-            border: 2px solid #e3e8ff;
-        }
-
-        .form-group {
-            margin-bottom: 15px;
-        }
-
-        .form-group label {
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 600;
-            color: #374151;
-            font-size: 1em;
-        }
-
-        .form-group input, .form-group select {
-            width: 100%;
-            padding: 12px;
-            border: 2px solid #d1d5db;
-            border-radius: 10px;
-            font-size: 1em;
-            transition: all 0.3s ease;
-        }
-
-        .form-group input:focus, .form-group select:focus {
-            outline: none;
-            border-color: #4facfe;
-            box-shadow: 0 0 0 3px rgba(79, 172, 254, 0.1);
-        }
-
-        .form-row {
-            display: grid;
-            grid-template-columns: 2fr 1fr;
-            gap: 15px;
-            align-items: end;
-        }
-
-        .btn-primary {
-            background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-            color: white;
-            border: none;
-            padding: 12px 20px;
-            border-radius: 10px;
-            font-size: 1em;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            width: 100%;
-        }
-
-        .btn-primary:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 10px 20px rgba(79, 172, 254, 0.3);
-        }
-
-        .btn-primary:disabled {
-            background: #9ca3af;
-            cursor: not-allowed;
-            transform: none;
-        }
-
-        .status-panel {
-            background: #f0f9ff;
-            border: 2px solid #0ea5e9;
-            border-radius: 15px;
-            padding: 20px;
-            margin-bottom: 20px;
-            display: none;
-        }
-
-        .status-panel.show {
-            display: block;
-        }
-
-        .status-header {
-            display: flex;
-            align-items: center;
-            margin-bottom: 15px;
-        }
-
-        .status-icon {
-            font-size: 1.2em;
-            margin-right: 10px;
-        }
-
-        .progress-bar {
-            width: 100%;
-            height: 20px;
-            background: #e5e7eb;
-            border-radius: 10px;
-            overflow: hidden;
-            margin: 15px 0;
-        }
-
-        .progress-fill {
-            height: 100%;
-            background: linear-gradient(90deg, #4facfe 0%, #00f2fe 100%);
-            width: 0%;
-            transition: width 0.3s ease;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: white;
-            font-weight: 600;
-            font-size: 0.9em;
-        }
-
-        .results-section {
-            background: #f9fafb;
-            border-radius: 15px;
-            padding: 20px;
-            display: none;
-        }
-
-        .results-section.show {
-            display: block;
-        }
-
-        .results-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 15px;
-            flex-wrap: wrap;
-            gap: 10px;
-        }
-
-        .results-title {
-            font-size: 1.3em;
-            font-weight: 600;
-            color: #1f2937;
-        }
-
-        .download-buttons {
-            display: flex;
-            gap: 8px;
-            flex-wrap: wrap;
-        }
-
-        .btn-download {
-            background: #10b981;
-            color: white;
-            border: none;
-            padding: 8px 15px;
-            border-radius: 8px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            font-size: 0.9em;
-        }
-
-        .btn-download:hover {
-            background: #059669;
-            transform: translateY(-1px);
-        }
-
-        .results-table {
-            width: 100%;
-            border-collapse: collapse;
-            background: white;
-            border-radius: 10px;
-            overflow: hidden;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }
-
-        .results-table th {
-            background: #374151;
-            color: white;
-            padding: 12px 8px;
-            text-align: left;
-            font-weight: 600;
-            font-size: 0.9em;
-        }
-
-        .results-table td {
-            padding: 12px 8px;
-            border-bottom: 1px solid #e5e7eb;
-            font-size: 0.9em;
-        }
-
-        .results-table tr:hover {
-            background: #f9fafb;
-        }
-
-        .price {
-            font-weight: 600;
-            color: #dc2626;
-        }
-
-        .rank {
-            background: #4facfe;
-            color: white;
-            padding: 4px 8px;
-            border-radius: 15px;
-            font-weight: 600;
-            text-align: center;
-            font-size: 0.8em;
-        }
-
-        .product-name {
-            overflow: hidden;
-            text-overflow: ellipsis;
-            white-space: nowrap;
-            max-width: 250px;
-            line-height: 1.3;
-        }
-
-        .link-btn {
-            background: #6366f1;
-            color: white;
-            text-decoration: none;
-            padding: 4px 10px;
-            border-radius: 5px;
-            font-size: 0.8em;
-            font-weight: 500;
-            transition: all 0.3s ease;
-            display: inline-block;
-        }
-
-        .link-btn:hover {
-            background: #4f46e5;
-        }
-
-        .coupang-btn {
-            background: #ff6b6b;
-        }
-
-        .coupang-btn:hover {
-            background: #ee5a5a;
-        }
-
-        .loading {
-            display: inline-block;
-            width: 16px;
-            height: 16px;
-            border: 2px solid #f3f3f3;
-            border-top: 2px solid #4facfe;
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-        }
-
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-
-        .alert {
-            padding: 12px;
-            border-radius: 10px;
-            margin-bottom: 15px;
-            font-size: 0.9em;
-        }
-
-        .alert-success {
-            background: #d1fae5;
-            border: 1px solid #10b981;
-            color: #047857;
-        }
-
-        .alert-error {
-            background: #fee2e2;
-            border: 1px solid #dc2626;
-            color: #991b1b;
-        }
-
-        /* 모바일 최적화 */
-        @media (max-width: 768px) {
-            body {
-                padding: 5px;
-            }
-            
-            .container {
-                border-radius: 15px;
-            }
-            
-            .header {
-                padding: 15px;
-            }
-            
-            .header h1 {
-                font-size: 1.5em;
-            }
-            
-            .main-content {
-                padding: 15px;
-            }
-            
-            .search-form {
-                padding: 15px;
-            }
-            
-            .form-row {
-                grid-template-columns: 1fr;
-                gap: 10px;
-            }
-            
-            .results-header {
-                flex-direction: column;
-                align-items: stretch;
-            }
-            
-            .download-buttons {
-                justify-content: center;
-            }
-            
-            /* 모바일에서 상품명 여러 줄 표시 */
-            .product-name {
-                white-space: normal;
-                text-overflow: unset;
-                max-width: none;
-                line-height: 1.4;
-                word-break: break-word;
-                padding: 8px 4px;
-            }
-            
-            .results-table {
-                font-size: 0.8em;
-            }
-            
-            .results-table th,
-            .results-table td {
-                padding: 8px 4px;
-            }
-            
-            .results-table th {
-                font-size: 0.8em;
-            }
-            
-            .rank {
-                padding: 3px 6px;
-                font-size: 0.7em;
-            }
-            
-            .link-btn {
-                padding: 3px 8px;
-                font-size: 0.7em;
-                margin: 1px;
-            }
-            
-            /* 모바일에서 테이블 열 너비 조정 */
-            .results-table th:nth-child(1),
-            .results-table td:nth-child(1) {
-                width: 60px;
-                text-align: center;
-            }
-            
-            .results-table th:nth-child(2),
-            .results-table td:nth-child(2) {
-                width: auto;
-                min-width: 150px;
-            }
-            
-            .results-table th:nth-child(3),
-            .results-table td:nth-child(3) {
-                width: 80px;
-            }
-            
-            .results-table th:nth-child(4),
-            .results-table td:nth-child(4),
-            .results-table th:nth-child(5),
-            .results-table td:nth-child(5) {
-                width: 60px;
-                text-align: center;
-            }
-        }
-
-        /* 초소형 모바일 (320px 이하) */
-        @media (max-width: 380px) {
-            .header h1 {
-                font-size: 1.3em;
-            }
-            
-            .results-table {
-                font-size: 0.75em;
-            }
-            
-            .results-table th,
-            .results-table td {
-                padding: 6px 2px;
-            }
-            
-            .product-name {
-                font-size: 0.85em;
-            }
-            
-            .link-btn {
-                font-size: 0.65em;
-                padding: 2px 6px;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🛒 다나와 프로 크롤러</h1>
-            <p>실시간 상품 정보 수집 시스템</p>
-        </div>
-
-        <div class="main-content">
-            <!-- 검색 폼 -->
-            <div class="search-form">
-                <form id="crawlForm">
-                    <div class="form-row">
-                        <div class="form-group">
-                            <label for="keyword">🔍 검색할 상품명</label>
-                            <input type="text" id="keyword" name="keyword" placeholder="예: 의자, 책상, 모니터..." required>
-                        </div>
-                        <div class="form-group">
-                            <label for="pages">📖 페이지 수</label>
-                            <select id="pages" name="pages">
-                                <option value="1">1페이지</option>
-                                <option value="2">2페이지</option>
-                                <option value="3" selected>3페이지</option>
-                                <option value="4">4페이지</option>
-                                <option value="5">5페이지</option>
-                            </select>
-                        </div>
-                    </div>
-                    <div class="form-group" style="margin-top: 15px;">
-                        <button type="submit" class="btn-primary" id="startBtn">
-                            🚀 크롤링 시작
-                        </button>
-                    </div>
-                </form>
-            </div>
-
-            <!-- 상태 패널 -->
-            <div class="status-panel" id="statusPanel">
-                <div class="status-header">
-                    <span class="status-icon">📊</span>
-                    <h3>크롤링 진행상황</h3>
-                </div>
-                <div id="statusMessage">준비 중...</div>
-                <div class="progress-bar">
-                    <div class="progress-fill" id="progressFill">0%</div>
-                </div>
-                <div id="detailStatus"></div>
-            </div>
-
-            <!-- 결과 섹션 -->
-            <div class="results-section" id="resultsSection">
-                <div class="results-header">
-                    <h3 class="results-title">📋 크롤링 결과</h3>
-                    <div class="download-buttons">
-                        <button class="btn-download" onclick="downloadResults('csv')">📊 CSV</button>
-                        <button class="btn-download" onclick="downloadResults('json')">📄 JSON</button>
-                    </div>
-                </div>
-                <div id="resultsContainer"></div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        let currentJobId = null;
-        let ws = null;
-
-        // WebSocket 연결
-        function connectWebSocket() {
-            const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-            ws = new WebSocket(`${protocol}//${window.location.host}/ws`);
-            
-            ws.onmessage = function(event) {
-                const data = JSON.parse(event.data);
-                updateProgress(data);
-            };
-            
-            ws.onclose = function() {
-                setTimeout(connectWebSocket, 3000); // 재연결 시도
-            };
-        }
-
-        // 폼 제출 처리
-        document.getElementById('crawlForm').addEventListener('submit', async function(e) {
-            e.preventDefault();
-            
-            const formData = new FormData();
-            formData.append('keyword', document.getElementById('keyword').value);
-            formData.append('pages', document.getElementById('pages').value);
-            
-            // UI 상태 변경
-            document.getElementById('startBtn').disabled = true;
-            document.getElementById('startBtn').innerHTML = '<span class="loading"></span> 크롤링 중...';
-            document.getElementById('statusPanel').classList.add('show');
-            document.getElementById('resultsSection').classList.remove('show');
-            
-            try {
-                const response = await fetch('/api/crawl/start', {
-                    method: 'POST',
-                    body: formData
-                });
-                
-                const result = await response.json();
-                currentJobId = result.job_id;
-                
-                document.getElementById('statusMessage').textContent = result.message;
-                
-            } catch (error) {
-                showAlert('크롤링 시작 중 오류가 발생했습니다: ' + error.message, 'error');
-                resetUI();
-            }
-        });
-
-        // 진행상황 업데이트
-        function updateProgress(data) {
-            if (data.job_id !== currentJobId) return;
-            
-            const progressFill = document.getElementById('progressFill');
-            const statusMessage = document.getElementById('statusMessage');
-            const detailStatus = document.getElementById('detailStatus');
-            
-            progressFill.style.width = data.progress + '%';
-            progressFill.textContent = data.progress + '%';
-            statusMessage.textContent = data.message;
-            
-            if (data.total_items > 0) {
-                detailStatus.textContent = `${data.current_item}/${data.total_items} 상품 처리 완료`;
-            }
-            
-            // 완료 시 결과 로드
-            if (data.status === '완료') {
-                loadResults();
-                resetUI();
-                showAlert('크롤링이 성공적으로 완료되었습니다!', 'success');
-            } else if (data.status === '실패' || data.status === '오류') {
-                resetUI();
-                showAlert('크롤링 중 오류가 발생했습니다.', 'error');
-            }
-        }
-
-        // 결과 로드
-        async function loadResults() {
-            if (!currentJobId) return;
-            
-            try {
-                const response = await fetch(`/api/crawl/results/${currentJobId}`);
-                const data = await response.json();
-                
-                if (data.results && data.results.length > 0) {
-                    displayResults(data.results);
-                    document.getElementById('resultsSection').classList.add('show');
-                }
-            } catch (error) {
-                showAlert('결과를 불러오는 중 오류가 발생했습니다.', 'error');
-            }
-        }
-
-        // 결과 표시
-        function displayResults(results) {
-            const container = document.getElementById('resultsContainer');
-            
-            let html = `
-                <table class="results-table">
-                    <thead>
-                        <tr>
-                            <th>순위</th>
-                            <th>상품명</th>
-                            <th>가격</th>
-                            <th>다나와</th>
-                            <th>쿠팡</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-            `;
-            
-            results.forEach((product, index) => {
-                html += `
-                    <tr>
-                        <td><span class="rank">${index + 1}</span></td>
-                        <td class="product-name" title="${product.name}">${product.name}</td>
-                        <td class="price">${product.price.toLocaleString()}원</td>
-                        <td>
-                            ${product.product_url ? 
-                                `<a href="${product.product_url}" target="_blank" class="link-btn">다나와</a>` : 
-                                '-'}
-                        </td>
-                        <td>
-                            <a href="${product.coupang_search_url}" target="_blank" class="link-btn coupang-btn">쿠팡</a>
-                        </td>
-                    </tr>
-                `;
-            });
-            
-            html += '</tbody></table>';
-            container.innerHTML = html;
-        }
-
-        // 결과 다운로드
-        async function downloadResults(format) {
-            if (!currentJobId) return;
-            
-            const url = `/api/crawl/download/${currentJobId}?format=${format}`;
-            window.open(url, '_blank');
-        }
-
-        // UI 리셋
-        function resetUI() {
-            document.getElementById('startBtn').disabled = false;
-            document.getElementById('startBtn').innerHTML = '🚀 크롤링 시작';
-        }
-
-        // 알림 표시
-        function showAlert(message, type) {
-            const alertDiv = document.createElement('div');
-            alertDiv.className = `alert alert-${type}`;
-            alertDiv.textContent = message;
-            
-            const mainContent = document.querySelector('.main-content');
-            mainContent.insertBefore(alertDiv, mainContent.firstChild);
-            
-            setTimeout(() => {
-                alertDiv.remove();
-            }, 5000);
-        }
-
-        // 페이지 로드 시 WebSocket 연결
-        window.addEventListener('load', function() {
-            connectWebSocket();
-        });
-    </script>
-</body>
-</html>
-"""
+        return _RE_WS.sub(' ', name).strip()
+
+# 웹 인터페이스는 static/index.html 파일로 분리
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+_INDEX_PATH = os.path.join(STATIC_DIR, "index.html")
+_INDEX_HEADERS = {'Cache-Control': 'public, max-age=300', 'Vary': 'Accept-Encoding'}
+
+def _load_index_gz():
+    """시작 시 한 번만 index.html을 메모리에서 gzip 압축 (소스 트리에는 아무것도 쓰지 않음)"""
+    stat = os.stat(_INDEX_PATH)
+    with open(_INDEX_PATH, 'rb') as f:
+        body = gzip.compress(f.read(), 9)
+    # FileResponse와 같은 방식(수정 시각-크기)의 ETag에 압축본 표시만 덧붙임
+    etag = hashlib.md5(f"{stat.st_mtime}-{stat.st_size}".encode()).hexdigest() + "-gz"
+    return body, {**_INDEX_HEADERS, 'ETag': etag, 'Content-Encoding': 'gzip'}
+
+_INDEX_GZ, _INDEX_GZ_HEADERS = _load_index_gz()
+
+# 결과 표 한 행 (format=html 응답용, 한 번 만든 포맷 문자열을 행마다 재사용)
+_RESULT_ROW_FMT = (
+    '<tr><td><span class="rank">{rank}</span></td>'
+    '<td class="product-name" title="{name}">{name}</td>'
+    '<td class="price">{price:,}원</td>'
+    '<td>{danawa_link}</td>'
+    '<td><a href="' + _COUPANG_SEARCH_PREFIX + '{coupang_query}" target="_blank" class="link-btn coupang-btn">쿠팡</a></td></tr>'
+)
+
+# 다운로드 컬럼 - 키 문자열을 한 번만 만들어 모든 행이 같은 객체를 공유
+_EXPORT_FIELDS = ('name', 'price', 'product_url', 'coupang_search_url')
+_export_row = attrgetter(*_EXPORT_FIELDS)
+
+# 정적 파일 (Range/304 처리는 StaticFiles가 담당)
+app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 # API 엔드포인트들
 @app.get("/", response_class=HTMLResponse)
-async def read_root():
-    """메인 페이지 - 완전한 웹 인터페이스"""
-    return HTMLResponse(content=HTML_TEMPLATE)
+async def read_root(request: Request):
+    """메인 페이지 - 시작 시 압축해 둔 바이트를 그대로 전송 (요청마다 압축 없음) + ETag 재검증"""
+    if_none_match = request.headers.get('if-none-match', '')
+    
+    if 'gzip' in request.headers.get('accept-encoding', ''):
+        etag = _INDEX_GZ_HEADERS['ETag']
+        if etag in if_none_match:
+            return Response(status_code=304, headers={**_INDEX_HEADERS, 'ETag': etag})
+        return Response(content=_INDEX_GZ, media_type="text/html", headers=_INDEX_GZ_HEADERS)
+    
+    # gzip을 받지 않는 클라이언트는 원본 파일 그대로
+    response = FileResponse(_INDEX_PATH, media_type="text/html", headers=_INDEX_HEADERS, stat_result=os.stat(_INDEX_PATH))
+    etag = response.headers['etag']
+    
+    if etag in if_none_match:
+        return Response(status_code=304, headers={**_INDEX_HEADERS, 'ETag': etag})
+    return response
+
+async def get_job(job_id: str) -> DanawaWebCrawler:
+    """작업 조회 - 한 번의 조회로 확인하고 없으면 404"""
+    crawler = crawling_jobs.get(job_id)
+    if crawler is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return crawler
 
 @app.get("/test")
 async def test():
@@ -1016,9 +601,10 @@ async def test():
 @app.post("/api/crawl/start")
 async def start_crawling(background_tasks: BackgroundTasks, keyword: str = Form(...), pages: int = Form(...)):
     """크롤링 시작"""
-    job_id = str(uuid.uuid4())
+    # 하이픈 없는 32자리 hex - 파일명에 바로 쓸 수 있음
+    job_id = uuid.uuid4().hex
     
-    crawler = DanawaWebCrawler(job_id)
+    crawler = DanawaWebCrawler(job_id, app.state.http, app.state.parse_pool)
     crawling_jobs[job_id] = crawler
     
     background_tasks.add_task(crawler.crawl_danawa, keyword, pages)
@@ -1026,71 +612,94 @@ async def start_crawling(background_tasks: BackgroundTasks, keyword: str = Form(
     return {"job_id": job_id, "status": "시작됨", "message": f"'{keyword}' 크롤링이 시작되었습니다."}
 
 @app.get("/api/crawl/status/{job_id}")
-async def get_crawling_status(job_id: str):
+async def get_crawling_status(job_id: str, crawler: DanawaWebCrawler = Depends(get_job)):
     """크롤링 상태 조회"""
-    if job_id not in crawling_jobs:
-        return {"error": "작업을 찾을 수 없습니다."}
-    
-    crawler = crawling_jobs[job_id]
     return {
         "job_id": job_id,
         "status": crawler.status,
         "progress": crawler.progress,
         "current_item": crawler.current_item,
         "total_items": crawler.total_items,
-        "result_count": len(crawler.results)
+        "result_count": crawler.result_count
     }
 
 @app.get("/api/crawl/results/{job_id}")
-async def get_crawling_results(job_id: str):
-    """크롤링 결과 조회"""
-    if job_id not in crawling_jobs:
-        return {"error": "작업을 찾을 수 없습니다."}
+async def get_crawling_results(job_id: str, format: str = "json", crawler: DanawaWebCrawler = Depends(get_job)):
+    """크롤링 결과 조회 - format=html이면 표 행 HTML 조각으로 반환"""
+    if format == "html":
+        rows = "".join(
+            _RESULT_ROW_FMT.format_map({
+                'rank': rank,
+                'name': html.escape(p.name),
+                'price': p.price,
+                'danawa_link': f'<a href="{html.escape(p.product_url)}" target="_blank" class="link-btn">다나와</a>' if p.product_url else '-',
+                'coupang_query': quote(p.name)
+            })
+            for rank, p in enumerate(crawler.results, start=1)
+        )
+        return HTMLResponse(content=rows)
     
-    crawler = crawling_jobs[job_id]
-    return {
+    # orjson이 슬롯 데이터클래스를 직접 직렬화하도록 jsonable_encoder를 거치지 않음
+    return ORJSONResponse({
         "job_id": job_id,
         "status": crawler.status,
         "results": crawler.results,
-        "total_count": len(crawler.results)
-    }
+        "total_count": crawler.result_count
+    })
 
 @app.get("/api/crawl/download/{job_id}")
-async def download_results(job_id: str, format: str = "csv"):
+async def download_results(job_id: str, format: str = "csv", crawler: DanawaWebCrawler = Depends(get_job)):
     """결과 다운로드"""
-    if job_id not in crawling_jobs:
-        return {"error": "작업을 찾을 수 없습니다."}
-    
-    crawler = crawling_jobs[job_id]
-    
     if format == "csv":
         filename = f"danawa_results_{job_id[:8]}.csv"
+        results = crawler.results
         
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            if crawler.results:
-                fieldnames = ['name', 'price', 'product_url', 'coupang_search_url']
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(crawler.results)
+        # 디스크 임시 파일 없이 작은 버퍼로 한 행씩 스트리밍
+        async def generate():
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(_EXPORT_FIELDS)
+            # 엑셀 한글 깨짐 방지용 BOM은 첫 청크에만
+            yield buf.getvalue().encode('utf-8-sig')
+            
+            for p in results:
+                buf.seek(0)
+                buf.truncate()
+                writer.writerow(_export_row(p))
+                yield buf.getvalue().encode('utf-8')
         
-        return FileResponse(filename, filename=filename)
+        return StreamingResponse(
+            generate(),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
     
     elif format == "json":
-        filename = f"danawa_results_{job_id[:8]}.json"
+        filename = f"danawa_results_{job_id[:8]}.ndjson"
+        results = crawler.results
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(crawler.results, f, ensure_ascii=False, indent=2)
+        # 한 줄에 상품 하나씩 스트리밍 (전체 직렬화 결과를 메모리에 올리지 않음)
+        async def generate():
+            for p in results:
+                yield orjson.dumps(dict(zip(_EXPORT_FIELDS, _export_row(p)))) + b"\n"
         
-        return FileResponse(filename, filename=filename)
+        return StreamingResponse(
+            generate(),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket 연결"""
     await websocket.accept()
-    active_connections.append(websocket)
+    active_connections.add(websocket)
     
     try:
+        # 클라이언트 메시지는 사용하지 않으므로 디코딩 없이 종료 감지만
         while True:
-            await websocket.receive_text()
-    except WebSocketDisconnect:
-        active_connections.remove(websocket)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    finally:
+        active_connections.discard(websocket)